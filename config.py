@@ -1,5 +1,20 @@
+import functools
+import os
+import types
+
+
 def load_env_file(path):
-    # Read KEY=VALUE lines from an env file into a dict.
+    # Read KEY=VALUE lines from an env file into a read-only mapping.
+    # Cached per (path, mtime) so repeated loads skip the file I/O.
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        mtime = None
+    return _load_env_file_cached(path, mtime)
+
+
+@functools.lru_cache(maxsize=None)
+def _load_env_file_cached(path, mtime):
     env = {}
     try:
         with open(path, "r", encoding="utf-8") as handle:
@@ -13,22 +28,35 @@ def load_env_file(path):
                 env[key.strip()] = value.strip()
     except FileNotFoundError:
         pass
-    return env
+    return types.MappingProxyType(env)
 
 
 def load_platform_config(platform_id, env):
     # Build a config dict for a platform from env values.
     key_prefix = platform_id.upper()
-    base_url = _clean_env_value(env.get(f"{key_prefix}_BASE_URL"))
-    api_key = _clean_env_value(env.get(f"{key_prefix}_API_KEY"))
-    model = _clean_env_value(env.get(f"{key_prefix}_MODEL"))
+    return _build_platform_config(
+        platform_id,
+        env.get(f"{key_prefix}_BASE_URL"),
+        env.get(f"{key_prefix}_API_KEY"),
+        env.get(f"{key_prefix}_MODEL"),
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _build_platform_config(platform_id, base_url, api_key, model):
+    # Cached on the raw env values so each platform config is built once.
+    base_url = _clean_env_value(base_url)
+    api_key = _clean_env_value(api_key)
+    model = _clean_env_value(model)
     if not api_key:
         return None
     if _requires_base_url(platform_id) and not base_url:
         return None
     if api_key.startswith("Bearer "):
         api_key = api_key[len("Bearer ") :]
-    return {"base_url": base_url, "api_key": api_key, "model": model}
+    return types.MappingProxyType(
+        {"base_url": base_url, "api_key": api_key, "model": model}
+    )
 
 
 def _clean_env_value(value):
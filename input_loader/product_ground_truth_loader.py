@@ -1,10 +1,21 @@
 import re
+import sys
 import zipfile
 import xml.etree.ElementTree as ET
 
 
 _NS = {"a": "http://schemas.openxmlformats.org/spreadsheetml/2006/main"}
-_CELL_REF_RE = re.compile(r"([A-Z]+)([0-9]+)")
+_ROW_TAG = "{%s}row" % _NS["a"]
+_SI_TAG = "{%s}si" % _NS["a"]
+_T_TAG = "{%s}t" % _NS["a"]
+# Clark-notation tags keep per-cell find() calls on ElementTree's C fast path;
+# prefixed paths with a namespace map go through the Python ElementPath module.
+_C_TAG = "{%s}c" % _NS["a"]
+_V_TAG = "{%s}v" % _NS["a"]
+_SST_UNIQUE_COUNT_RE = re.compile(rb'<sst\b[^>]*\buniqueCount="([0-9]+)"')
+_SHEET_RID_RE = re.compile(rb'<sheet\b[^>]*\br:id="([^"]+)"')
+
+
 def load_product_ground_truth(path):
     # Load ground-truth rows keyed by sku_id with comma-separated values.
     rows = _load_xlsx_rows(path)
@@ -32,49 +43,85 @@ def load_product_ground_truth(path):
 def _load_xlsx_rows(path):
     # Load rows from the first worksheet as dicts keyed by the header row.
     try:
-        with zipfile.ZipFile(path) as zf:
-            shared_strings = _read_shared_strings(zf)
-            sheet_xml = _read_first_sheet(zf)
+        zf = zipfile.ZipFile(path)
     except FileNotFoundError:
         return []
 
-    rows = _parse_sheet_rows(sheet_xml, shared_strings)
-    if not rows:
-        return []
-
-    header = rows[0]
-    data_rows = rows[1:]
-    result = []
-    for row in data_rows:
-        row_dict = {}
-        for idx, name in enumerate(header):
-            if not name:
-                continue
-            row_dict[name] = row[idx] if idx < len(row) else ""
-        result.append(row_dict)
-    return result
+    with zf:
+        shared_strings = _read_shared_strings(zf)
+        sheet_path = _find_first_sheet_path(zf)
+        # Parse straight from the zip entry so the decompressed sheet is never
+        # held in memory as a whole.
+        with zf.open(sheet_path) as sheet_stream:
+            rows = _parse_sheet_rows(sheet_stream, shared_strings)
+            header = next(rows, None)
+            if header is None:
+                return []
+
+            header_cols = [
+                (col, name) for col, name in sorted(header.items()) if name
+            ]
+            return [
+                {name: cells.get(col, "") for col, name in header_cols}
+                for cells in rows
+            ]
 
 
 def _read_shared_strings(zf):
     # Collect shared strings for resolving string cell references.
     try:
-        shared_xml = zf.read("xl/sharedStrings.xml")
+        stream = zf.open("xl/sharedStrings.xml")
     except KeyError:
         return []
 
-    root = ET.fromstring(shared_xml)
-    strings = []
-    for si in root.findall("a:si", _NS):
-        texts = []
-        for t in si.findall(".//a:t", _NS):
-            texts.append(t.text or "")
-        strings.append("".join(texts))
+    with stream:
+        # Presize from the <sst uniqueCount="N"> header when present; peek()
+        # reads ahead without consuming what iterparse will see.
+        match = _SST_UNIQUE_COUNT_RE.search(stream.peek(512))
+        expected = int(match.group(1)) if match else 0
+        strings = [""] * expected
+        count = 0
+        for si in _iter_elements(stream, _SI_TAG):
+            # Shared strings are reused across cells, so intern them once.
+            text = sys.intern("".join(t.text or "" for t in si.iter(_T_TAG)))
+            if count < expected:
+                strings[count] = text
+            else:
+                strings.append(text)
+            count += 1
+    del strings[count:]
     return strings
 
 
-def _read_first_sheet(zf):
-    # XLSX uses workbook.xml to map sheet IDs to files.
+def _find_first_sheet_path(zf):
+    # XLSX uses workbook.xml to map sheet IDs to files; return the zip path.
     workbook_xml = zf.read("xl/workbook.xml")
+    rels_xml = zf.read("xl/_rels/workbook.xml.rels")
+    target = _match_first_sheet_target(workbook_xml, rels_xml)
+    if target is None:
+        target = _parse_first_sheet_target(workbook_xml, rels_xml)
+    return "xl/" + target.lstrip("/")
+
+
+def _match_first_sheet_target(workbook_xml, rels_xml):
+    # Fast path: pull the first sheet target with regexes instead of building
+    # DOMs for metadata-only reads. Returns None when the markup is unusual.
+    sheet_match = _SHEET_RID_RE.search(workbook_xml)
+    if not sheet_match:
+        return None
+    rel_match = re.search(
+        rb'<Relationship\b[^>]*\bId="'
+        + re.escape(sheet_match.group(1))
+        + rb'"[^>]*\bTarget="([^"&]+)"',
+        rels_xml,
+    )
+    if not rel_match:
+        return None
+    return rel_match.group(1).decode("utf-8")
+
+
+def _parse_first_sheet_target(workbook_xml, rels_xml):
+    # Full XML parse fallback for workbooks the fast path cannot handle.
     workbook_root = ET.fromstring(workbook_xml)
     sheet = workbook_root.find("a:sheets/a:sheet", _NS)
     if sheet is None:
@@ -83,68 +130,76 @@ def _read_first_sheet(zf):
     sheet_id = sheet.attrib.get(
         "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}id"
     )
-    rels_xml = zf.read("xl/_rels/workbook.xml.rels")
     rels_root = ET.fromstring(rels_xml)
     for rel in rels_root:
         if rel.attrib.get("Id") == sheet_id:
-            target = rel.attrib.get("Target")
-            break
-    else:
-        raise ValueError("Worksheet relationship not found.")
-
-    sheet_path = "xl/" + target.lstrip("/")
-    return zf.read(sheet_path)
+            return rel.attrib.get("Target")
+    raise ValueError("Worksheet relationship not found.")
 
 
-def _parse_sheet_rows(sheet_xml, shared_strings):
-    # Build dense row arrays from sparse cell entries.
-    root = ET.fromstring(sheet_xml)
-    rows = []
-    max_col = 0
-    raw_rows = []
-
-    for row in root.findall(".//a:sheetData/a:row", _NS):
+def _parse_sheet_rows(sheet_stream, shared_strings):
+    # Yield sparse {col_index: value} dicts per row; callers pad to the header.
+    for row in _iter_elements(sheet_stream, _ROW_TAG):
         cells = {}
-        for cell in row.findall("a:c", _NS):
-            ref = cell.attrib.get("r")
-            if not ref:
-                continue
-            match = _CELL_REF_RE.match(ref)
-            if not match:
+        for cell in row.findall(_C_TAG):
+            col_index = _ref_to_col_index(cell.attrib.get("r"))
+            if not col_index:
                 continue
-            col_letters = match.group(1)
-            col_index = _col_to_index(col_letters)
-            max_col = max(max_col, col_index)
             cells[col_index] = _read_cell_value(cell, shared_strings)
-        raw_rows.append(cells)
-
-    for cells in raw_rows:
-        row_vals = [""] * max_col
-        for col_index, value in cells.items():
-            row_vals[col_index - 1] = value
-        rows.append(row_vals)
-    return rows
+        yield cells
+
+
+def _iter_elements(stream, tag):
+    # Stream completed elements with a given tag. Each one is cleared and
+    # detached from its parent (tracked from "start" events) once consumed,
+    # so the parsed tree only holds the rows/strings of iterparse's current
+    # read-ahead chunk, however large the sheet is.
+    parents = []
+    for event, elem in ET.iterparse(stream, events=("start", "end")):
+        if event == "start":
+            parents.append(elem)
+            continue
+        parents.pop()
+        if elem.tag != tag:
+            continue
+        yield elem
+        elem.clear()
+        if parents:
+            parents[-1].remove(elem)
 
 
 def _read_cell_value(cell, shared_strings):
     # Decode cell values, handling shared and inline strings.
     cell_type = cell.attrib.get("t")
-    value_node = cell.find("a:v", _NS)
+    value_node = cell.find(_V_TAG)
     if cell_type == "s":
         if value_node is None or value_node.text is None:
             return ""
         return shared_strings[int(value_node.text)]
     if cell_type == "inlineStr":
-        text_node = cell.find(".//a:t", _NS)
+        text_node = next(cell.iter(_T_TAG), None)
         return text_node.text if text_node is not None else ""
     if value_node is None or value_node.text is None:
         return ""
     return value_node.text
 
 
-def _col_to_index(col_letters):
-    # Convert Excel column letters (e.g. "AB") to 1-based index.
+def _ref_to_col_index(ref):
+    # Convert a cell reference (e.g. "AB12") to its 1-based column index, or 0
+    # when the reference is malformed. Avoids a regex match per cell.
+    if not ref:
+        return 0
+    if len(ref) == 2 and ref[1].isdigit():
+        index = ord(ref[0]) - 64
+        return index if 0 < index <= 26 else 0
     index = 0
-    for ch in col_letters:
-        index = index * 26 + (ord(ch) - 64)
+    pos = 0
+    for ch in ref:
+        code = ord(ch) - 64
+        if not 0 < code <= 26:
+            break
+        index = index * 26 + code
+        pos += 1
+    if not pos or not ref[pos : pos + 1].isdigit():
+        return 0
     return index
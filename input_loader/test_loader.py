@@ -18,15 +18,18 @@ def load_tests_xlsx(path):
         return []
 
     header = rows[0]
-    data_rows = rows[1:]
+    # Resolve named columns once and pad short rows up front so each row dict
+    # is built by a single comprehension without per-cell bounds checks.
+    valid_cols = [(idx, name) for idx, name in enumerate(header) if name]
+    if not valid_cols:
+        return [{} for _ in rows[1:]]
+    width = valid_cols[-1][0] + 1
+    pad = [""] * width
     result = []
-    for row in data_rows:
-        row_dict = {}
-        for idx, name in enumerate(header):
-            if not name:
-                continue
-            row_dict[name] = row[idx] if idx < len(row) else ""
-        result.append(row_dict)
+    for row in rows[1:]:
+        if len(row) < width:
+            row = row + pad[len(row) :]
+        result.append({name: row[idx] for idx, name in valid_cols})
     return result
 
 
@@ -1,4 +1,5 @@
 import argparse
+import functools
 
 from config import load_env_file
 from test_runner import run_tests
@@ -15,6 +16,7 @@ DATASET_CONFIGS = {
 }
 
 
+@functools.lru_cache(maxsize=None)
 def _resolve_dataset_config(dataset):
     dataset = (dataset or DEFAULT_DATASET).strip().lower()
     if dataset in DATASET_CONFIGS:
@@ -55,10 +57,22 @@ def _parse_args():
         default=None,
         help="Optional scenario_id to stop at (inclusive).",
     )
+    parser.add_argument(
+        "--resume",
+        default=None,
+        help="Earlier report path (.xlsx or .jsonl) to continue; logged steps are skipped.",
+    )
     return parser.parse_args()
 
 def _resolve_scoring_platform_id(env):
-    value = env.get(SCORING_PLATFORM_ENV_KEY, DEFAULT_SCORING_PLATFORM_ID)
+    return _normalize_scoring_platform_id(
+        env.get(SCORING_PLATFORM_ENV_KEY, DEFAULT_SCORING_PLATFORM_ID)
+    )
+
+
+@functools.lru_cache(maxsize=None)
+def _normalize_scoring_platform_id(value):
+    # Cached on the raw value since the env mapping itself is not hashable.
     value = value.strip() if value else ""
     return value or DEFAULT_SCORING_PLATFORM_ID
 
@@ -80,6 +94,7 @@ def main():
         scoring_prompt_path=dataset_config.get("scoring_prompt"),
         scoring_platform_id=scoring_platform_id,
         excluded_platforms=excluded_platforms,
+        resume_from=args.resume,
     )
 
 
@@ -1,10 +1,45 @@
+import base64
+import functools
+import http.client
 import json
 import os
+import select
+import threading
+import urllib.error
+import urllib.parse
 import urllib.request
 
 
-def execute_prompt(platform_id, prompt, config):
+# Encoders are built once; json.dumps with keyword arguments builds a new
+# JSONEncoder on every call.
+_PAYLOAD_ENCODER = json.JSONEncoder(separators=(",", ":"), check_circular=False)
+_GENAI_ENCODER = json.JSONEncoder(ensure_ascii=True, default=str)
+# Idle keep-alive connections per (scheme, host, proxy), shared by all worker threads
+# so a connection opened by one scenario or scoring thread is reused by others.
+_IDLE_CONNECTIONS = {}
+_IDLE_CONNECTIONS_LOCK = threading.Lock()
+_MAX_IDLE_CONNECTIONS_PER_HOST = 50
+# google-genai clients per API key; a client keeps its own connection pool,
+# so one is shared by every thread instead of being created per prompt.
+_GENAI_CLIENTS = {}
+_GENAI_CLIENTS_LOCK = threading.Lock()
+_STALE_CONNECTION_ERRORS = (
+    http.client.RemoteDisconnected,
+    http.client.CannotSendRequest,
+    ConnectionResetError,
+    BrokenPipeError,
+)
+# Redirects are followed as urllib's default opener does: at most 10 hops,
+# with 301/302/303 turned into a GET without the body.
+_MAX_REDIRECTS = 10
+_REDIRECT_STATUSES = frozenset({301, 302, 303, 307, 308})
+
+
+def execute_prompt(platform_id, prompt, config, cacheable_prefix=""):
     # Send a prompt to a REST-backed platform and return raw response text.
+    # cacheable_prefix marks a leading part of prompt that repeats across
+    # calls; CLAUDE gets it as a cache_control block, while the OpenAI-style
+    # APIs cache repeated prompt prefixes on their own.
     if not config:
         raise ValueError(f"Missing config for platform_id={platform_id}")
     platform_id = platform_id.upper()
@@ -18,7 +53,9 @@ def execute_prompt(platform_id, prompt, config):
         return _post_json(config["base_url"], config["api_key"], payload)
 
     if platform_id == "CLAUDE":
-        payload = _build_claude_payload(prompt, config.get("model"))
+        payload = _build_claude_payload(
+            prompt, config.get("model"), cacheable_prefix=cacheable_prefix
+        )
         return _post_json(
             config["base_url"],
             config["api_key"],
@@ -52,7 +89,7 @@ def execute_gemini_prompt(prompt, config):
 
     # Force API-key mode for AI Studio keys (avoid Vertex-only auth).
     os.environ.setdefault("GOOGLE_GENAI_USE_VERTEXAI", "0")
-    client = _create_genai_client(genai, config["api_key"])
+    client = _get_genai_client(genai, config["api_key"])
     try:
         response = client.models.generate_content(model=model, contents=prompt)
     except Exception as exc:
@@ -68,23 +105,44 @@ def execute_gemini_prompt(prompt, config):
     return full_response, text_response
 
 
+# Request bodies have a fixed shape, so they are rendered from f-string
+# templates and only the variable fields are JSON-encoded per call.
 def _build_chatgpt_payload(prompt, model):
-    # Build ChatGPT-specific request payload.
-    return {"model": model, "input": prompt}
+    # Build ChatGPT-specific request body.
+    return f'{{"model":{_encode(model)},"input":{_encode(prompt)}}}'.encode("utf-8")
 
 
 def _build_messages_payload(prompt, model):
-    # Build generic chat messages payload.
-    return {"model": model, "messages": [{"role": "user", "content": prompt}]}
+    # Build generic chat messages request body.
+    return (
+        f'{{"model":{_encode(model)},'
+        f'"messages":[{{"role":"user","content":{_encode(prompt)}}}]}}'
+    ).encode("utf-8")
 
 
-def _build_claude_payload(prompt, model, max_tokens=1024):
-    # Build Claude-specific request payload.
-    return {
-        "model": model,
-        "max_tokens": max_tokens,
-        "messages": [{"role": "user", "content": prompt}],
-    }
+def _build_claude_payload(prompt, model, max_tokens=1024, cacheable_prefix=""):
+    # Build Claude-specific request body. A cacheable prefix is sent as its own
+    # text block marked for ephemeral prompt caching.
+    content = _encode(prompt)
+    if (
+        cacheable_prefix
+        and len(prompt) > len(cacheable_prefix)
+        and prompt.startswith(cacheable_prefix)
+    ):
+        content = (
+            f'[{{"type":"text","text":{_encode(cacheable_prefix)},'
+            f'"cache_control":{{"type":"ephemeral"}}}},'
+            f'{{"type":"text","text":{_encode(prompt[len(cacheable_prefix):])}}}]'
+        )
+    return (
+        f'{{"model":{_encode(model)},"max_tokens":{_encode(max_tokens)},'
+        f'"messages":[{{"role":"user","content":{content}}}]}}'
+    ).encode("utf-8")
+
+
+def _encode(value):
+    # JSON-encode a single payload field with the shared compact encoder.
+    return _PAYLOAD_ENCODER.encode(value)
 
 
 def _extract_genai_text(response):
@@ -116,13 +174,23 @@ def _serialize_genai_response(response):
                 continue
             if isinstance(value, str):
                 return value
-            return json.dumps(value, ensure_ascii=True, default=str)
+            return _GENAI_ENCODER.encode(value)
     try:
-        return json.dumps(response, ensure_ascii=True, default=str)
+        return _GENAI_ENCODER.encode(response)
     except TypeError:
         return str(response)
 
 
+def _get_genai_client(genai_module, api_key):
+    # Return the shared genai client for api_key, creating it on first use.
+    with _GENAI_CLIENTS_LOCK:
+        client = _GENAI_CLIENTS.get(api_key)
+        if client is None:
+            client = _create_genai_client(genai_module, api_key)
+            _GENAI_CLIENTS[api_key] = client
+        return client
+
+
 def _create_genai_client(genai_module, api_key):
     # Try API-key auth options for genai client init.
     for kwargs in ({"api_key": api_key, "vertexai": False}, {"api_key": api_key}):
@@ -133,9 +201,8 @@ def _create_genai_client(genai_module, api_key):
     return genai_module.Client(api_key=api_key)
 
 
-def _post_json(url, api_key, payload, extra_headers=None, auth_header="Authorization"):
-    # POST JSON payload and return the response text.
-    body = json.dumps(payload).encode("utf-8")
+def _post_json(url, api_key, body, extra_headers=None, auth_header="Authorization"):
+    # POST an encoded JSON body and return the response text.
     auth_value = f"Bearer {api_key}" if auth_header.lower() == "authorization" else api_key
     headers = {
         "Content-Type": "application/json",
@@ -143,13 +210,179 @@ def _post_json(url, api_key, payload, extra_headers=None, auth_header="Authoriza
     }
     if extra_headers:
         headers.update(extra_headers)
-    request = urllib.request.Request(url, data=body, headers=headers, method="POST")
-    try:
-        with urllib.request.urlopen(request, timeout=120) as response:
-            return response.read().decode("utf-8")
-    except urllib.error.HTTPError as exc:
-        # Bubble up API error bodies for easier debugging.
-        detail = exc.read().decode("utf-8", errors="replace")
+    method = "POST"
+    for _ in range(_MAX_REDIRECTS + 1):
+        response, data = _send_request(method, url, body, headers)
+        location = response.getheader("Location")
+        if response.status not in _REDIRECT_STATUSES or not location:
+            break
+        url = urllib.parse.urljoin(url, location)
+        if response.status not in (307, 308):
+            method, body = "GET", None
+            headers = {
+                name: value
+                for name, value in headers.items()
+                if name.lower() not in ("content-type", "content-length")
+            }
+    else:
         raise urllib.error.HTTPError(
-            exc.url, exc.code, f"{exc.msg}: {detail}", exc.hdrs, exc.fp
-        ) from exc
+            url,
+            response.status,
+            f"Too many redirects (more than {_MAX_REDIRECTS})",
+            response.headers,
+            None,
+        )
+    if response.status >= 300:
+        # Bubble up API error bodies for easier debugging; a 3xx left here had
+        # no Location to follow.
+        detail = data.decode("utf-8", errors="replace")
+        raise urllib.error.HTTPError(
+            url, response.status, f"{response.reason}: {detail}", response.headers, None
+        )
+    return data.decode("utf-8")
+
+
+def _send_request(method, url, body, headers):
+    # Send a request over a pooled keep-alive connection, so TLS handshakes are
+    # paid once per connection instead of once per prompt.
+    parts = urllib.parse.urlsplit(url)
+    path = parts.path or "/"
+    if parts.query:
+        path = f"{path}?{parts.query}"
+    proxy = _resolve_proxy(parts.scheme, parts.netloc)
+    key = (parts.scheme, parts.netloc, proxy)
+    if proxy and parts.scheme == "http":
+        # Plain HTTP goes through the proxy with the absolute URL as the
+        # request target, as urllib does.
+        path = urllib.parse.urlunsplit(parts._replace(fragment=""))
+        if proxy[2]:
+            headers = dict(headers, **{"Proxy-Authorization": proxy[2]})
+    while True:
+        connection = _checkout_connection(key)
+        reused = connection.sock is not None
+        try:
+            connection.request(method, path, body=body, headers=headers)
+        except _STALE_CONNECTION_ERRORS:
+            connection.close()
+            if reused:
+                # The server closed an idle connection before the request went
+                # out; send it again on another one.
+                continue
+            raise
+        except Exception:
+            connection.close()
+            raise
+        try:
+            response = connection.getresponse()
+            data = response.read()
+        except Exception:
+            # The request may have reached the server, so it is not replayed
+            # here; the caller's retry policy decides.
+            connection.close()
+            raise
+        if response.will_close:
+            connection.close()
+        else:
+            _checkin_connection(key, connection)
+        return response, data
+
+
+def _checkout_connection(key):
+    # Take the most recently used idle connection for (scheme, host, proxy),
+    # or create one; connections are used by one thread at a time. Idle
+    # connections the server has already closed are dropped, not reused.
+    while True:
+        with _IDLE_CONNECTIONS_LOCK:
+            idle = _IDLE_CONNECTIONS.get(key)
+            connection = idle.pop() if idle else None
+        if connection is None:
+            break
+        if not _is_connection_dropped(connection):
+            return connection
+        connection.close()
+    scheme, netloc, proxy = key
+    if scheme == "https":
+        if proxy:
+            # HTTPS goes through the proxy in a CONNECT tunnel.
+            connection = http.client.HTTPSConnection(
+                proxy[0], proxy[1], timeout=120
+            )
+            tunnel_headers = {"Proxy-Authorization": proxy[2]} if proxy[2] else None
+            connection.set_tunnel(netloc, headers=tunnel_headers)
+            return connection
+        return http.client.HTTPSConnection(netloc, timeout=120)
+    if scheme == "http":
+        if proxy:
+            return http.client.HTTPConnection(proxy[0], proxy[1], timeout=120)
+        return http.client.HTTPConnection(netloc, timeout=120)
+    raise ValueError(f"Unsupported URL scheme: {scheme}")
+
+
+def _is_connection_dropped(connection):
+    # An idle keep-alive socket that is readable has been closed by the
+    # server (or has unexpected data); either way it cannot be reused.
+    sock = connection.sock
+    if sock is None:
+        return False
+    try:
+        readable, _, _ = select.select([sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
+
+
+@functools.lru_cache(maxsize=None)
+def _resolve_proxy(scheme, netloc):
+    # (host, port, proxy_authorization) for the proxy that the HTTP_PROXY /
+    # HTTPS_PROXY / NO_PROXY environment selects for this host, or None.
+    # Cached per host; proxy settings are read once per process, as urllib's
+    # default opener does.
+    proxy_url = urllib.request.getproxies().get(scheme)
+    if not proxy_url:
+        return None
+    host = urllib.parse.urlsplit(f"{scheme}://{netloc}").hostname or netloc
+    if urllib.request.proxy_bypass(host):
+        return None
+    if "://" not in proxy_url:
+        proxy_url = f"http://{proxy_url}"
+    proxy = urllib.parse.urlsplit(proxy_url)
+    authorization = None
+    if proxy.username is not None:
+        credentials = (
+            f"{urllib.parse.unquote(proxy.username)}:"
+            f"{urllib.parse.unquote(proxy.password or '')}"
+        )
+        authorization = "Basic " + base64.b64encode(credentials.encode()).decode(
+            "ascii"
+        )
+    default_port = 443 if proxy.scheme == "https" else 80
+    return proxy.hostname, proxy.port or default_port, authorization
+
+
+def _checkin_connection(key, connection):
+    # Return a connection to the idle pool, closing it if the pool is full.
+    with _IDLE_CONNECTIONS_LOCK:
+        idle = _IDLE_CONNECTIONS.setdefault(key, [])
+        if len(idle) < _MAX_IDLE_CONNECTIONS_PER_HOST:
+            idle.append(connection)
+            return
+    connection.close()
+
+
+def close_connections():
+    # Close all idle pooled connections and shared genai clients; call once a
+    # run has finished.
+    with _IDLE_CONNECTIONS_LOCK:
+        pools = list(_IDLE_CONNECTIONS.values())
+        _IDLE_CONNECTIONS.clear()
+    for idle in pools:
+        for connection in idle:
+            connection.close()
+    with _GENAI_CLIENTS_LOCK:
+        clients = list(_GENAI_CLIENTS.values())
+        _GENAI_CLIENTS.clear()
+    for client in clients:
+        # Older google-genai releases have no close().
+        close = getattr(client, "close", None)
+        if callable(close):
+            close()
@@ -0,0 +1,65 @@
+import collections
+import threading
+import time
+
+
+class RateLimiter:
+    # Sliding-window limiter on requests and estimated tokens per minute, with
+    # an optional minimum spacing between request starts. Thread-safe; callers
+    # block in acquire() only as long as the limits need.
+
+    def __init__(
+        self, max_rpm=None, max_tpm=None, window_seconds=60.0, min_interval=0.0
+    ):
+        self.max_rpm = max_rpm
+        self.max_tpm = max_tpm
+        self.window_seconds = window_seconds
+        self.min_interval = min_interval
+        self._events = collections.deque()
+        self._tokens = 0
+        # Earliest start for the next request; it is charged when a request
+        # starts, so the spacing overlaps with that request's own latency.
+        self._next_allowed = 0.0
+        self._lock = threading.Lock()
+
+    def acquire(self, estimated_tokens=0):
+        # Block until a request of estimated_tokens fits in the window, then
+        # record it against the limits.
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._expire(now)
+                wait = max(
+                    self._wait_seconds(now, estimated_tokens),
+                    self._next_allowed - now,
+                )
+                if wait <= 0:
+                    self._events.append((now, estimated_tokens))
+                    self._tokens += estimated_tokens
+                    self._next_allowed = now + self.min_interval
+                    return
+            time.sleep(wait)
+
+    def _expire(self, now):
+        # Drop requests that have aged out of the window.
+        cutoff = now - self.window_seconds
+        while self._events and self._events[0][0] <= cutoff:
+            _, tokens = self._events.popleft()
+            self._tokens -= tokens
+
+    def _wait_seconds(self, now, estimated_tokens):
+        # Minimum wait until both the request and token limits have room.
+        wait = 0.0
+        if self.max_rpm and len(self._events) >= self.max_rpm:
+            oldest = self._events[len(self._events) - self.max_rpm][0]
+            wait = oldest + self.window_seconds - now
+        excess = self._tokens + estimated_tokens - (self.max_tpm or 0)
+        if self.max_tpm and self._events and excess > 0:
+            freed = 0
+            for timestamp, tokens in self._events:
+                freed += tokens
+                if freed >= excess:
+                    break
+            # Oversized requests wait for the whole window to drain.
+            wait = max(wait, timestamp + self.window_seconds - now)
+        return wait
@@ -1,50 +1,92 @@
+import functools
 import zipfile
 from xml.sax.saxutils import escape as _xml_escape
 
 
-def write_xlsx_report(path, fieldnames, rows):
-    sheet_xml = _build_sheet_xml(fieldnames, rows)
+_ESCAPE_CACHE_MAX_LEN = 256
+
+
+def write_xlsx_report(path, fieldnames, rows, compress=True):
     workbook_xml = _build_workbook_xml()
     workbook_rels_xml = _build_workbook_rels_xml()
     styles_xml = _build_styles_xml()
     content_types_xml = _build_content_types_xml()
     rels_xml = _build_rels_xml()
 
-    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
-        zf.writestr("[Content_Types].xml", content_types_xml)
-        zf.writestr("_rels/.rels", rels_xml)
-        zf.writestr("xl/workbook.xml", workbook_xml)
-        zf.writestr("xl/_rels/workbook.xml.rels", workbook_rels_xml)
-        zf.writestr("xl/worksheets/sheet1.xml", sheet_xml)
-        zf.writestr("xl/styles.xml", styles_xml)
-
-
-def _build_sheet_xml(fieldnames, rows):
-    lines = [
-        '<?xml version="1.0" encoding="UTF-8"?>',
-        '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">',
-        "<sheetData>",
-    ]
-    header_cells = _build_row_cells(1, fieldnames)
-    lines.append(f'<row r="1">{header_cells}</row>')
+    # Boilerplate parts are a few hundred bytes, so deflating them costs more
+    # than it saves; only the sheet is compressed, at a fast level. With
+    # compress=False the sheet is stored too, skipping zlib entirely.
+    sheet_compression = zipfile.ZIP_DEFLATED if compress else zipfile.ZIP_STORED
+    with zipfile.ZipFile(path, "w", sheet_compression, compresslevel=1) as zf:
+        zf.writestr(
+            "[Content_Types].xml", content_types_xml, compress_type=zipfile.ZIP_STORED
+        )
+        zf.writestr("_rels/.rels", rels_xml, compress_type=zipfile.ZIP_STORED)
+        zf.writestr(
+            "xl/workbook.xml", workbook_xml, compress_type=zipfile.ZIP_STORED
+        )
+        zf.writestr(
+            "xl/_rels/workbook.xml.rels",
+            workbook_rels_xml,
+            compress_type=zipfile.ZIP_STORED,
+        )
+        with zf.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            _write_sheet_xml(sheet, fieldnames, rows)
+        zf.writestr("xl/styles.xml", styles_xml, compress_type=zipfile.ZIP_STORED)
+
+
+_SHEET_XML_START = (
+    b'<?xml version="1.0" encoding="UTF-8"?>'
+    b'<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main">'
+    b"<sheetData>"
+)
+_SHEET_XML_END = b"</sheetData></worksheet>"
+# Sheet XML is handed to the zip stream whenever this much has accumulated,
+# so memory stays flat however many rows the report has.
+_SHEET_FLUSH_BYTES = 1 << 20
+
+
+def _write_sheet_xml(handle, fieldnames, rows):
+    # Stream the sheet into handle row by row; rows may be any iterable,
+    # including a generator. Fragments accumulate in one bytearray that is
+    # flushed in large chunks rather than per row.
+    buf = bytearray(_SHEET_XML_START)
+    _build_row_cells_into(buf, 1, fieldnames)
     for idx, row in enumerate(rows, start=2):
         values = [row.get(name, "") for name in fieldnames]
-        row_cells = _build_row_cells(idx, values)
-        lines.append(f'<row r="{idx}">{row_cells}</row>')
-    lines.extend(["</sheetData>", "</worksheet>"])
-    return "".join(lines)
+        _build_row_cells_into(buf, idx, values)
+        if len(buf) >= _SHEET_FLUSH_BYTES:
+            handle.write(buf)
+            buf.clear()
+    buf += _SHEET_XML_END
+    handle.write(buf)
 
 
-def _build_row_cells(row_index, values):
-    cells = []
+def _build_row_cells_into(buf, row_index, values):
+    row_ref = str(row_index)
+    buf += b'<row r="%s">' % row_ref.encode("ascii")
     for col_index, value in enumerate(values, start=1):
-        col_letters = _index_to_col(col_index)
-        cell_ref = f"{col_letters}{row_index}"
-        safe_value = _xml_escape(str(value))
-        cells.append(
-            f'<c r="{cell_ref}" t="inlineStr"><is><t>{safe_value}</t></is></c>'
+        col_letters = (
+            _COL_LETTERS[col_index - 1]
+            if col_index <= _MAX_COLUMNS
+            else _index_to_col(col_index)
         )
-    return "".join(cells)
+        text = str(value)
+        if len(text) <= _ESCAPE_CACHE_MAX_LEN:
+            safe_value = _escape_cached(text)
+        else:
+            safe_value = _xml_escape(text)
+        buf += (
+            f'<c r="{col_letters}{row_ref}" t="inlineStr"><is><t>{safe_value}</t></is></c>'
+        ).encode("utf-8")
+    buf += b"</row>"
+
+
+@functools.lru_cache(maxsize=4096)
+def _escape_cached(text):
+    # Many columns (ids, step types, scores) repeat across rows; escape each
+    # short value once. Long values such as model responses bypass the cache.
+    return _xml_escape(text)
 
 
 def _index_to_col(index):
@@ -55,6 +97,11 @@ def _index_to_col(index):
     return letters
 
 
+# Excel caps sheets at 16384 columns (XFD); precompute every column's letters.
+_MAX_COLUMNS = 16384
+_COL_LETTERS = tuple(_index_to_col(i) for i in range(1, _MAX_COLUMNS + 1))
+
+
 def _build_workbook_xml():
     return (
         '<?xml version="1.0" encoding="UTF-8"?>'
@@ -1,5 +1,6 @@
+import json
 import os
-from datetime import datetime
+from datetime import datetime, timezone
 
 from reporter.report_xlsx import write_xlsx_report
 
@@ -25,36 +26,109 @@ OUTPUT_FIELDS = [
     "comments",
     *SCORING_FIELDS,
 ]
+# Bookkeeping keys test_runner adds to input rows; they are not report columns.
+_RUNNER_KEYS = frozenset({"_step_index_f", "_platform_id"})
+# Built once; json.dumps with keyword arguments builds a new encoder per call.
+_RESULT_LOG_ENCODER = json.JSONEncoder(
+    ensure_ascii=False, separators=(",", ":"), check_circular=False
+)
 
 
 def build_report_path(reports_dir="reports"):
     # Build a timestamped report path in the reports directory.
     os.makedirs(reports_dir, exist_ok=True)
-    timestamp = datetime.utcnow().strftime("%Y%m%d_%H%M%S")
+    timestamp = datetime.now(timezone.utc).strftime("%Y%m%d_%H%M%S")
     return os.path.join(reports_dir, f"test_report_{timestamp}.xlsx")
 
 
-def write_report(results, input_rows, reports_dir="reports", report_path=None):
+def write_report(
+    results, input_rows, reports_dir="reports", report_path=None, compress=True
+):
     # Write an XLSX report with input columns and updated model outputs.
+    # compress=False skips deflating the sheet for frequent progress writes.
     os.makedirs(reports_dir, exist_ok=True)
     path = report_path or build_report_path(reports_dir)
-    fieldnames = extract_fieldnames(input_rows, results)
-    results_by_key = {result_key(row): row for row in results}
-    rows = []
+    # One pass over results builds the lookup and collects their columns.
+    results_by_key = {}
+    result_fields = set()
+    for result in results:
+        results_by_key[result_key(result)] = result
+        result_fields.update(result)
+    fieldnames = _build_fieldnames(input_rows, results, result_fields)
+    if input_rows:
+        rows = _iter_report_rows(input_rows, results_by_key)
+    else:
+        rows = (_build_result_row(row) for row in results)
+    # Rows are generated while the sheet is streamed, so the merged report is
+    # never held in memory as a whole.
+    write_xlsx_report(path, fieldnames, rows, compress=compress)
+    return path
+
+
+def _iter_report_rows(input_rows, results_by_key):
+    # Yield input rows with their result's output fields filled in.
+    get_result = results_by_key.get
     for input_row in input_rows:
         row = dict(input_row)
-        result = results_by_key.get(result_key(input_row))
+        # Skip building the lookup key entirely when nothing has run yet.
+        result = get_result(result_key(input_row)) if results_by_key else None
         if result:
             for field in OUTPUT_FIELDS:
                 if field in row or field in result:
                     row[field] = result.get(field, "")
-        rows.append(row)
-    if not input_rows and results:
-        rows = [
-            _build_result_row(row) for row in results
-        ]
-    write_xlsx_report(path, fieldnames, rows)
-    return path
+        yield row
+
+
+def build_results_log_path(report_path):
+    # JSONL step log written next to the XLSX report.
+    return os.path.splitext(report_path)[0] + ".jsonl"
+
+
+def open_results_log(report_path):
+    # Open the step log for line-buffered appends. A line torn by a crash is
+    # ended first, so the next record starts on a line of its own.
+    path = build_results_log_path(report_path)
+    handle = open(path, "a", encoding="utf-8", buffering=1)
+    if not _ends_with_newline(path):
+        handle.write("\n")
+    return handle
+
+
+def _ends_with_newline(path):
+    # True for an empty or missing file, or one whose last byte is a newline.
+    try:
+        with open(path, "rb") as handle:
+            handle.seek(0, os.SEEK_END)
+            if handle.tell() == 0:
+                return True
+            handle.seek(-1, os.SEEK_END)
+            return handle.read(1) == b"\n"
+    except FileNotFoundError:
+        return True
+
+
+def append_result_log(handle, result):
+    # Append one finished step as a JSON line; cheap enough to do per step.
+    handle.write(_RESULT_LOG_ENCODER.encode(result) + "\n")
+
+
+def load_results_log(report_path):
+    # Read results back from the step log, skipping a line torn by a crash.
+    results = []
+    try:
+        handle = open(build_results_log_path(report_path), "r", encoding="utf-8")
+    except FileNotFoundError:
+        return results
+    with handle:
+        for line in handle:
+            line = line.strip()
+            if not line:
+                continue
+            try:
+                results.append(json.loads(line))
+            except ValueError:
+                continue
+    return results
 
 
 def format_scenario(row):
@@ -84,24 +158,25 @@ def result_key(row):
 
 def extract_fieldnames(input_rows, results):
     # Pick output columns based on input rows, falling back to minimal fields.
+    result_fields = set()
+    for row in results or []:
+        result_fields.update(row)
+    return _build_fieldnames(input_rows, results, result_fields)
+
+
+def _build_fieldnames(input_rows, results, result_fields):
     if input_rows:
-        fieldnames = list(input_rows[0].keys())
-        _append_missing_fields(fieldnames, results, OUTPUT_FIELDS)
-        return fieldnames
-    if results:
+        fieldnames = [field for field in input_rows[0] if field not in _RUNNER_KEYS]
+    elif results:
         fieldnames = ["scenario", "user_prompt"]
         fieldnames.extend(OUTPUT_FIELDS)
-        _append_missing_fields(fieldnames, results, OUTPUT_FIELDS)
-        return fieldnames
-    return []
-
-
-def _append_missing_fields(fieldnames, results, extra_fields):
-    for field in extra_fields:
-        if field in fieldnames:
-            continue
-        if any(field in row for row in results or []):
+    else:
+        return []
+    existing = set(fieldnames)
+    for field in OUTPUT_FIELDS:
+        if field not in existing and field in result_fields:
             fieldnames.append(field)
+    return fieldnames
 
 
 def _build_result_row(row):
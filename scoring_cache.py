@@ -0,0 +1,53 @@
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+
+
+class ScoringCache:
+    # SQLite-backed map from scoring-request digests to normalized scores, so
+    # byte-identical scoring requests are answered without an API call.
+    # Thread-safe; one connection is shared behind a lock.
+
+    def __init__(self, path):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False)
+        self._connection.execute(
+            "CREATE TABLE IF NOT EXISTS scores (key TEXT PRIMARY KEY, value TEXT NOT NULL)"
+        )
+        self._connection.commit()
+
+    @staticmethod
+    def make_key(*parts):
+        # SHA-256 over the parts, separated so ("ab", "c") != ("a", "bc").
+        digest = hashlib.sha256()
+        for part in parts:
+            digest.update(str(part).encode("utf-8"))
+            digest.update(b"\0")
+        return digest.hexdigest()
+
+    def get(self, key):
+        # Return the cached value for key, or None on a miss.
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT value FROM scores WHERE key = ?", (key,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, key, value):
+        # Store value under key, replacing any earlier entry.
+        encoded = json.dumps(value, ensure_ascii=False)
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO scores (key, value) VALUES (?, ?)",
+                (key, encoded),
+            )
+            self._connection.commit()
+
+    def close(self):
+        with self._lock:
+            self._connection.close()
@@ -1,16 +1,35 @@
+import collections
+import contextlib
+import email.utils
+import functools
+import http.client
 import json
+import logging
+import logging.handlers
+import operator
 import os
+import queue
+import random
 import re
+import string
+import sys
 import time
 import threading
-from concurrent.futures import ThreadPoolExecutor, as_completed
+import urllib.error
+from concurrent.futures import ThreadPoolExecutor
 
 from config import load_env_file, load_platform_config
-from platform_clients import execute_prompt, execute_gemini_prompt
+from platform_clients import close_connections, execute_prompt, execute_gemini_prompt
+from rate_limiter import RateLimiter
+from scoring_cache import ScoringCache
 from reporter.reporting import (
+    append_result_log,
     build_report_path,
+    build_results_log_path,
     extract_fieldnames,
     format_scenario,
+    load_results_log,
+    open_results_log,
     result_key,
     write_report,
 )
@@ -18,9 +37,68 @@ from input_loader.product_ground_truth_loader import load_product_ground_truth
 from input_loader.test_loader import load_tests_xlsx
 
 
-CLAUDE_DELAY_SECONDS = 10
+_LOGGER = logging.getLogger("test_runner")
+
+# Requests per minute applied when {PLATFORM}_RPM is not set; Claude keeps the
+# pace of the former fixed 10 second delay between calls.
+DEFAULT_PLATFORM_RPM = {"CLAUDE": 6}
+# Minimum seconds between call starts when neither {PLATFORM}_RPM nor
+# {PLATFORM}_MIN_INTERVAL is set; spreads Claude's default 6 RPM evenly
+# instead of allowing bursts of 6, without capping a user-raised RPM.
+DEFAULT_PLATFORM_MIN_INTERVAL = {"CLAUDE": 10.0}
+DEFAULT_PLATFORM_CONCURRENCY = 1
+DEFAULT_SCORING_CONCURRENCY = 4
+# Steps scored per scoring call; 1 keeps the one-call-per-step behavior.
+DEFAULT_SCORING_BATCH_SIZE = 1
+# Longest a partial scoring batch waits for more steps, from any scenario,
+# before it is scored anyway; SCORING_BATCH_WAIT_MS overrides it.
+DEFAULT_SCORING_BATCH_WAIT_MS = 500
+# Responses shorter than this are recorded with blank scores instead of being
+# sent to the scoring platform; SCORING_MIN_RESPONSE_CHARS overrides it.
+DEFAULT_MIN_SCORABLE_CHARS = 1
+# Steps between XLSX progress rewrites; every step is still appended to the
+# JSONL log, and the XLSX is always written once more at the end of the run.
+REPORT_WRITE_INTERVAL = 25
 STEP_RETRY_COUNT = 2
 STEP_RETRY_BACKOFF_SECONDS = 5
+# Retries back off exponentially from STEP_RETRY_BACKOFF_SECONDS up to this
+# cap, sleeping a random fraction of it so throttled threads spread out.
+STEP_RETRY_MAX_BACKOFF_SECONDS = 60
+# Longest wait taken from a server's Retry-After header; larger values are
+# clamped so one throttled step cannot park a worker for hours.
+STEP_RETRY_AFTER_MAX_SECONDS = 120
+# HTTP statuses worth retrying; other 4xx errors fail the same way again.
+_RETRYABLE_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+_RETRYABLE_ERRORS = (urllib.error.URLError, http.client.HTTPException, OSError)
+_JSON_DECODER = json.JSONDecoder()
+_JSON_START_CHARS = ("{", "[")
+# A fenced ```json block in a scoring reply; its contents are the intended
+# answer even when the surrounding prose also contains braces.
+_JSON_CODE_FENCE_RE = re.compile(r"```(?:json)?\s*([\[{].*?)\s*```", re.DOTALL)
+_STEP_SORT_KEY = operator.itemgetter("_step_index_f")
+_SCENARIO_ID_RE = re.compile(r"([A-Za-z]*)([0-9]+)")
+# Large chat-completions bodies (citations, search results) are scanned for
+# choices[0].message.content directly instead of being decoded into dicts.
+_MESSAGE_CONTENT_PLATFORMS = ("PERPLEX", "COPILOT")
+# A provider error body that came back with a success status; text
+# extraction falls back to the raw payload, so it reaches scoring as the
+# "response" unless caught.
+_ERROR_PAYLOAD_RE = re.compile(r'\s*\{\s*"error"\s*:')
+_ERROR_PAYLOAD_COMMENT = "Response is an API error payload; not scored."
+# The fast path reads only the first message after the "choices" key, and
+# only when its content is a string right at the start of that message. The
+# string body is matched one character or escape at a time; nesting a "+"
+# inside the "*" backtracks exponentially on an unterminated string.
+_CHOICES_KEY_RE = re.compile(r'"choices"\s*:\s*\[')
+_MESSAGE_KEY_RE = re.compile(r'"message"\s*:\s*\{')
+_MESSAGE_CONTENT_RE = re.compile(
+    r'\s*(?:"role"\s*:\s*"assistant"\s*,\s*)?'
+    r'"content"\s*:\s*"((?:[^"\\]|\\.)*)"'
+)
+_FAST_EXTRACT_MIN_CHARS = 32 * 1024
+_SCORING_TEMPLATE_FIELDS = frozenset(
+    ("step_type", "user_prompt", "model_response", "ground_truth")
+)
 SCORING_FIELDS = [
     "identity_accuracy_score",
     "attribute_completeness_score",
@@ -36,93 +114,443 @@ SCORING_FIELDS = [
     "agent_failure_modes",
     "comments",
 ]
+_SCORING_FIELDS_SET = frozenset(SCORING_FIELDS)
+# Blank value for every scoring field; copied for callers that fill it in.
+_EMPTY_SCORES = dict.fromkeys(SCORING_FIELDS, "")
+
+
+def _run_scenario_streams(platform_sequences, platform_limits, worker_count, run_stream):
+    # Run every (scenario, platform) stream from one shared queue. A free
+    # worker takes the next scenario of the least busy platform that is below
+    # its {PLATFORM}_CONCURRENCY cap, so no worker waits on a saturated
+    # platform while another platform has work. Steps within a stream stay
+    # sequential since they share history.
+    pending = {
+        platform_id: collections.deque(scenario_steps)
+        for platform_id, scenario_steps in platform_sequences.items()
+    }
+    running = dict.fromkeys(pending, 0)
+    condition = threading.Condition()
+    with ThreadPoolExecutor(max_workers=worker_count) as executor:
+        for _ in range(worker_count):
+            executor.submit(
+                _stream_worker, pending, running, platform_limits, condition, run_stream
+            )
+
+
+def _stream_worker(pending, running, platform_limits, condition, run_stream):
+    # Pull streams until the queue is empty; failures are logged per stream.
+    while True:
+        task = _take_stream(pending, running, platform_limits, condition)
+        if task is None:
+            return
+        platform_id, scenario_id, steps = task
+        try:
+            run_stream(scenario_id, steps, platform_id)
+        except Exception as exc:
+            _log(
+                "Unexpected error while running scenario "
+                f"scenario_id={scenario_id} platform_id={platform_id}: "
+                f"{type(exc).__name__}: {exc}"
+            )
+        finally:
+            with condition:
+                running[platform_id] -= 1
+                condition.notify_all()
 
 
-def _run_platform_sequence(
+def _take_stream(pending, running, platform_limits, condition):
+    # Claim the next runnable stream, waiting while every platform with work
+    # left is at its cap; None once nothing is pending.
+    with condition:
+        while any(pending.values()):
+            eligible = [
+                platform_id
+                for platform_id, streams in pending.items()
+                if streams and running[platform_id] < platform_limits[platform_id]
+            ]
+            if eligible:
+                platform_id = min(eligible, key=running.__getitem__)
+                running[platform_id] += 1
+                scenario_id, steps = pending[platform_id].popleft()
+                return platform_id, scenario_id, steps
+            condition.wait()
+        return None
+
+
+def _run_scenario(
+    scenario_id,
+    steps,
     platform_id,
-    scenario_steps,
-    env,
+    platform_configs,
+    scoring_platform_id,
+    result_queue,
+    scoring_batcher,
+    scorable_step_types,
+    min_scorable_chars,
+    completed,
+):
+    # Execute one scenario's steps in order, carrying conversation history.
+    # Scoring does not feed back into the conversation, so executed steps are
+    # handed to scoring_batcher and the next step starts without waiting.
+    config = platform_configs[platform_id]
+    _log(
+        f"Running scenario_id={scenario_id} platform_id={platform_id} steps={len(steps)}"
+    )
+    history = []
+    for step in steps:
+        step_scenario_id, step_platform_id = _resolve_step_identity(
+            scenario_id, platform_id, step
+        )
+        prompt = step.get("user_prompt", "")
+        cached = completed.get(result_key(step)) if completed else None
+        if cached is not None:
+            # Recorded by the run being resumed; replay it into the history so
+            # later steps see the same conversation.
+            _append_conversation_turn(
+                history, prompt, cached.get("text_model_response", "")
+            )
+            continue
+        full_prompt = _build_conversation_prompt(history, prompt)
+        step_id = step.get("step_id", "")
+        step_index = step.get("step_index", "")
+        # Shared identity fragment for this step's log lines.
+        ctx = (
+            f"scenario_id={step_scenario_id} platform_id={step_platform_id} "
+            f"step_id={step_id} step_index={step_index}"
+        )
+        _log(f"Executing step {ctx}")
+        comments = ""
+        executed = False
+        try:
+            response, text_response = _execute_step_with_retries(
+                platform_id, full_prompt, config, ctx
+            )
+            executed = True
+        except Exception as exc:
+            response = ""
+            text_response = ""
+            comments = f"Unexpected error: {type(exc).__name__}: {exc}"
+            _log(
+                f"Unexpected error while executing step {ctx}: "
+                f"{type(exc).__name__}: {exc}"
+            )
+        result = {
+            "scenario_id": step_scenario_id,
+            "platform_id": step_platform_id,
+            "step_id": step_id,
+            "step_index": step_index,
+            "user_prompt": prompt,
+            "model_response": text_response,
+            "full_model_response": response,
+            "text_model_response": text_response,
+            "comments": comments,
+            "run_id": step.get("run_id", ""),
+            "step_type": step.get("step_type", ""),
+        }
+        _append_conversation_turn(history, prompt, text_response)
+        if not executed:
+            result_queue.put(result)
+            continue
+        if scoring_platform_id and not _is_scorable(
+            step, text_response, scorable_step_types, min_scorable_chars
+        ):
+            # Skip the scoring round-trip; the step gets blank score columns.
+            result.update(_EMPTY_SCORES)
+            if _ERROR_PAYLOAD_RE.match(text_response):
+                result["comments"] = _ERROR_PAYLOAD_COMMENT
+            result_queue.put(result)
+            continue
+        scoring_batcher.add((result, step))
+
+
+class _ScoringBatcher:
+    # Collects executed (result, step) pairs from all running scenarios and
+    # hands them to submit_batch in batches of batch_size. A partial batch is
+    # submitted once its first item has waited max_wait seconds, so scoring
+    # never stalls on a quiet platform.
+
+    def __init__(self, submit_batch, batch_size, max_wait):
+        self._submit_batch = submit_batch
+        self._batch_size = max(1, batch_size)
+        self._max_wait = max_wait
+        self._pending = []
+        self._timer = None
+        self._lock = threading.Lock()
+
+    def add(self, item):
+        # Queue one item, submitting the batch as soon as it is full.
+        with self._lock:
+            self._pending.append(item)
+            if len(self._pending) >= self._batch_size:
+                self._submit_pending()
+            elif self._timer is None:
+                self._timer = threading.Timer(self._max_wait, self.flush)
+                self._timer.daemon = True
+                self._timer.start()
+
+    def flush(self):
+        # Submit whatever is pending; call once no more items will be added.
+        with self._lock:
+            self._submit_pending()
+
+    def _submit_pending(self):
+        # Submitting under the lock keeps a timer flush from racing the final
+        # flush past the scoring executor's shutdown.
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        if self._pending:
+            batch, self._pending = self._pending, []
+            self._submit_batch(batch)
+
+
+def _score_and_record(
+    batch,
     scoring_platform_id,
     scoring_config,
     scoring_prompt_template,
     ground_truth_by_sku,
-    results,
-    filtered_rows,
-    report_path,
-    report_lock,
+    result_queue,
 ):
-    config = load_platform_config(platform_id, env)
-    for scenario_id, steps in scenario_steps:
-        _log(
-            f"Running scenario_id={scenario_id} platform_id={platform_id} steps={len(steps)}"
+    # Score executed (result, step) pairs and record them; runs on the scoring
+    # executor, so failures are logged here rather than surfacing via a future,
+    # and every step is recorded even when scoring fails outright.
+    try:
+        scored = _score_batch(
+            scoring_platform_id,
+            scoring_config,
+            scoring_prompt_template,
+            ground_truth_by_sku,
+            batch,
         )
-        history = []
-        for step in steps:
-            step_scenario_id, step_platform_id = _resolve_step_identity(
-                scenario_id, platform_id, step
-            )
-            prompt = step.get("user_prompt", "")
-            full_prompt = _build_conversation_prompt(history, prompt)
+    except Exception as exc:
+        _log(f"Unexpected error while scoring batch: {type(exc).__name__}: {exc}")
+        error = f"Scoring error: {type(exc).__name__}: {exc}"
+        scored = [(_EMPTY_SCORES.copy(), error) for _ in batch]
+    for (result, _), (scoring_values, scoring_error) in zip(batch, scored):
+        try:
+            comments = scoring_values.pop("comments", "")
+            if scoring_error:
+                comments = _join_comment(comments, scoring_error)
+            result["comments"] = comments
+            result.update(scoring_values)
+            result_queue.put(result)
+        except Exception as exc:
             _log(
-                "Executing step "
-                f"scenario_id={step_scenario_id} platform_id={step_platform_id} "
-                f"step_id={step.get('step_id', '')} step_index={step.get('step_index', '')}"
+                "Unexpected error while recording step "
+                f"scenario_id={result['scenario_id']} platform_id={result['platform_id']} "
+                f"step_id={result['step_id']} step_index={result['step_index']}: "
+                f"{type(exc).__name__}: {exc}"
             )
-            comments = ""
-            scoring_values = {}
-            scoring_error = ""
+
+
+def _score_batch(
+    scoring_platform_id,
+    scoring_config,
+    scoring_prompt_template,
+    ground_truth_by_sku,
+    batch,
+):
+    # Return (scoring_values, scoring_error) per (result, step) in batch. Steps
+    # with responses share one scoring call when there are several; anything
+    # the batched reply does not cover is scored on its own.
+    batched = {}
+    positions = [
+        pos for pos, (result, _) in enumerate(batch) if result["text_model_response"]
+    ]
+    cache_keys = {}
+    if _SCORING_CACHE is not None and scoring_platform_id and scoring_config:
+        # Cached steps are answered here and left out of the batched call;
+        # the keys match single-step scoring, so both paths share entries.
+        # A step whose prompt or lookup fails is scored without the cache,
+        # where the error ends up in its comments.
+        for pos in positions:
+            result, step = batch[pos]
             try:
-                response, text_response = _execute_step_with_retries(
-                    step_platform_id,
-                    full_prompt,
-                    config,
-                    step_scenario_id,
-                    step,
+                cache_key = _scoring_cache_key(
+                    scoring_platform_id,
+                    scoring_config,
+                    _build_scoring_prompt(
+                        scoring_prompt_template,
+                        step,
+                        result["text_model_response"],
+                        ground_truth_by_sku,
+                    ),
+                )
+                cached = _scoring_cache_get(cache_key)
+            except Exception as exc:
+                _log(
+                    "Scoring cache lookup failed; scoring without cache: "
+                    f"{type(exc).__name__}: {exc}"
                 )
-                _maybe_throttle(step_platform_id)
-                scoring_values, scoring_error = _score_step(
+                continue
+            cache_keys[pos] = cache_key
+            if cached is not None:
+                batched[pos] = cached
+        positions = [pos for pos in positions if pos not in batched]
+    if len(positions) > 1 and scoring_platform_id and scoring_config:
+        try:
+            scores = _score_steps_batched(
+                scoring_platform_id,
+                scoring_config,
+                scoring_prompt_template,
+                ground_truth_by_sku,
+                [batch[pos] for pos in positions],
+            )
+        except Exception as exc:
+            scores = None
+            _log(
+                "Batched scoring failed; scoring steps individually: "
+                f"{type(exc).__name__}: {exc}"
+            )
+        if scores is not None:
+            for pos, values in zip(positions, scores):
+                batched[pos] = values
+                if pos in cache_keys:
+                    _scoring_cache_put(cache_keys[pos], values)
+    scored = []
+    for pos, (result, step) in enumerate(batch):
+        if pos in batched:
+            scored.append((batched[pos], ""))
+            continue
+        try:
+            scored.append(
+                _score_step(
                     scoring_platform_id,
                     scoring_config,
                     scoring_prompt_template,
                     ground_truth_by_sku,
                     step,
-                    text_response,
+                    result["text_model_response"],
                 )
-                comments = scoring_values.pop("comments", "")
-            except Exception as exc:
-                response = ""
-                text_response = ""
-                comments = f"Unexpected error: {type(exc).__name__}: {exc}"
-                _log(
-                    "Unexpected error while executing step "
-                    f"scenario_id={step_scenario_id} platform_id={step_platform_id} "
-                    f"step_id={step.get('step_id', '')} step_index={step.get('step_index', '')}: "
-                    f"{type(exc).__name__}: {exc}"
+            )
+        except Exception as exc:
+            scored.append(({}, f"Scoring error: {type(exc).__name__}: {exc}"))
+    return scored
+
+
+def _score_steps_batched(
+    scoring_platform_id,
+    scoring_config,
+    scoring_prompt_template,
+    ground_truth_by_sku,
+    items,
+):
+    # Score several (result, step) pairs with one call. Returns normalized
+    # values per item, or None when the reply cannot be matched back.
+    scoring_prompt = _build_batched_scoring_prompt(
+        scoring_prompt_template,
+        [step for _, step in items],
+        [result["text_model_response"] for result, _ in items],
+        ground_truth_by_sku,
+    )
+    _acquire_rate_limit(scoring_platform_id, scoring_prompt)
+    scoring_raw = execute_prompt(
+        scoring_platform_id,
+        scoring_prompt,
+        scoring_config,
+        cacheable_prefix=_scoring_template_sections(scoring_prompt_template)[0],
+    )
+    scoring_text = _extract_text_response(scoring_platform_id, scoring_raw)
+    scores = _parse_scoring_response(scoring_text, expected=list)
+    if (
+        not isinstance(scores, list)
+        or len(scores) != len(items)
+        or not all(isinstance(entry, dict) for entry in scores)
+    ):
+        _log(
+            "Batched scoring reply did not match the batch; "
+            f"scoring {len(items)} steps individually."
+        )
+        return None
+    # Entries carrying an "index" are put back in step order; indexes that
+    # are not exactly 0..n-1 cannot be trusted, so the batch is rescored.
+    indexes = [entry.get("index") for entry in scores]
+    if any(index is not None for index in indexes):
+        if not all(type(index) is int for index in indexes) or sorted(
+            indexes
+        ) != list(range(len(items))):
+            _log(
+                "Batched scoring reply has unusable step indexes; "
+                f"scoring {len(items)} steps individually."
+            )
+            return None
+        scores = sorted(scores, key=operator.itemgetter("index"))
+    return [_normalize_scores(entry) for entry in scores]
+
+
+def _load_completed_results(report_path):
+    # Map result keys to steps already logged for a report. Steps that failed
+    # before producing a response are left out so they run again; later log
+    # lines win, since a resumed run appends to the same log.
+    completed = {}
+    for result in load_results_log(report_path):
+        if result.get("full_model_response"):
+            completed[result_key(result)] = result
+    return completed
+
+
+def _drop_stale_completed(completed, scenarios):
+    # Keep only each scenario's leading run of completed steps. Once a step
+    # runs again its response can differ, so the later recorded steps no
+    # longer follow from the conversation and run again too.
+    kept = {}
+    for platforms in scenarios.values():
+        for steps in platforms.values():
+            for step in steps:
+                key = result_key(step)
+                if key not in completed:
+                    break
+                kept[key] = completed[key]
+    return kept
+
+
+@contextlib.contextmanager
+def _result_writer(results, filtered_rows, report_path):
+    # Run the single thread that records finished steps and yield its queue.
+    # Workers only put results on the queue, so recording never contends on
+    # a lock; leaving the block drains the queue and stops the thread.
+    result_queue = queue.SimpleQueue()
+    with open_results_log(report_path) as report_log:
+        writer = threading.Thread(
+            target=_write_results,
+            args=(result_queue, results, filtered_rows, report_path, report_log),
+            name="result-writer",
+        )
+        writer.start()
+        try:
+            yield result_queue
+        finally:
+            result_queue.put(None)
+            writer.join()
+
+
+def _write_results(result_queue, results, filtered_rows, report_path, report_log):
+    # Append each queued result to results and the JSONL log, and rewrite the
+    # XLSX every REPORT_WRITE_INTERVAL steps; rewriting it every step makes
+    # report I/O quadratic in the step count. Stops at a None sentinel.
+    while True:
+        result = result_queue.get()
+        if result is None:
+            return
+        try:
+            results.append(result)
+            append_result_log(report_log, result)
+            if len(results) % REPORT_WRITE_INTERVAL == 0:
+                write_report(
+                    results, filtered_rows, report_path=report_path, compress=False
                 )
-            if scoring_error:
-                comments = _join_comment(comments, scoring_error)
-            result = {
-                "scenario_id": step_scenario_id,
-                "platform_id": step_platform_id,
-                "step_id": step.get("step_id", ""),
-                "step_index": step.get("step_index", ""),
-                "user_prompt": prompt,
-                "model_response": text_response,
-                "full_model_response": response,
-                "text_model_response": text_response,
-                "comments": comments,
-                "run_id": step.get("run_id", ""),
-                "step_type": step.get("step_type", ""),
-                **scoring_values,
-            }
-            _append_conversation_turn(history, prompt, text_response)
-            with report_lock:
-                results.append(result)
-                write_report(results, filtered_rows, report_path=report_path)
             _log(
-                "Updated report after step "
-                f"scenario_id={step_scenario_id} platform_id={step_platform_id} "
-                f"step_id={step.get('step_id', '')} step_index={step.get('step_index', '')}"
+                "Recorded step "
+                f"scenario_id={result['scenario_id']} platform_id={result['platform_id']} "
+                f"step_id={result['step_id']} step_index={result['step_index']}"
+            )
+        except Exception as exc:
+            # Keep the writer alive; the final report still includes the step.
+            _log(
+                "Unexpected error while writing results: "
+                f"{type(exc).__name__}: {exc}"
             )
 
 
@@ -136,13 +564,52 @@ def run_tests(
     scoring_prompt_path=None,
     scoring_platform_id=None,
     excluded_platforms=None,
+    resume_from=None,
+):
+    # Execute test steps and return a list of result dicts. resume_from names
+    # an earlier report whose logged steps are kept instead of run again.
+    with _queued_logging():
+        return _run_tests(
+            xlsx_path,
+            env_path,
+            platform_id,
+            scenario_start,
+            scenario_end,
+            ground_truth_path,
+            scoring_prompt_path,
+            scoring_platform_id,
+            excluded_platforms,
+            resume_from,
+        )
+
+
+def _run_tests(
+    xlsx_path,
+    env_path,
+    platform_id,
+    scenario_start,
+    scenario_end,
+    ground_truth_path,
+    scoring_prompt_path,
+    scoring_platform_id,
+    excluded_platforms,
+    resume_from,
 ):
-    # Execute test steps and return a list of result dicts.
+    # Body of run_tests, run with queued logging in place. resume_from names
+    # an earlier report whose logged steps are kept instead of run again.
     if not xlsx_path:
         raise ValueError("xlsx_path is required.")
+    if resume_from:
+        report_path = os.path.splitext(resume_from)[0] + ".xlsx"
+        if not (
+            os.path.exists(report_path)
+            or os.path.exists(build_results_log_path(report_path))
+        ):
+            # Starting fresh at a mistyped path would silently rerun everything.
+            raise FileNotFoundError(f"Resume report not found: {resume_from}")
     _log(f"Loading test rows from {xlsx_path}")
     env = load_env_file(env_path)
-    scoring_platform_id = scoring_platform_id or None
+    scoring_platform_id = (scoring_platform_id or "").strip().upper() or None
     scoring_config = None
     if scoring_platform_id:
         scoring_config = load_platform_config(scoring_platform_id, env)
@@ -166,6 +633,14 @@ def run_tests(
         scoring_platform_id = None
         _log("Ground truth missing; skipping scoring.")
     rows = load_tests_xlsx(xlsx_path)
+    # Normalize platform_id and parse step_index once per row, so later stages
+    # compare interned uppercase ids and sort on a plain float. The input's
+    # platform_id is left as written; it is what results and the report use.
+    for row in rows:
+        row["_platform_id"] = sys.intern(
+            (row.get("platform_id") or "").strip().upper()
+        )
+        row["_step_index_f"] = _to_float(row.get("step_index", "0"))
     excluded_platforms = {p.upper() for p in (excluded_platforms or set())}
     if platform_id:
         if isinstance(platform_id, (set, list, tuple)):
@@ -174,14 +649,14 @@ def run_tests(
             platform_items = [platform_id]
         normalized = {item.strip().upper() for item in platform_items if item}
         rows = [
-            row for row in rows if row.get("platform_id", "").upper() in normalized
+            row for row in rows if row["_platform_id"] in normalized
         ]
         _log(f"Filtered rows to platform_id={sorted(normalized)}: {len(rows)} rows")
     if excluded_platforms:
         rows = [
             row
             for row in rows
-            if row.get("platform_id", "").upper() not in excluded_platforms
+            if row["_platform_id"] not in excluded_platforms
         ]
         _log(
             "Filtered rows by excluded platforms "
@@ -191,41 +666,85 @@ def run_tests(
     filtered_rows = _flatten_scenarios(scenarios)
     _log(f"Loaded {len(filtered_rows)} rows across {len(scenarios)} scenarios")
 
-    results = []
-    report_lock = threading.Lock()
-    report_path = build_report_path()
-    write_report(results, filtered_rows, report_path=report_path)
+    completed = {}
+    if resume_from:
+        completed = _drop_stale_completed(
+            _load_completed_results(report_path), scenarios
+        )
+        _log(f"Resuming {report_path} with {len(completed)} completed steps")
+    else:
+        report_path = build_report_path()
+    results = list(completed.values())
+    write_report(results, filtered_rows, report_path=report_path, compress=False)
     _log(f"Initialized report at {report_path}")
     platform_sequences = _build_platform_sequences(scenarios)
-    max_workers = max(1, len(platform_sequences))
-    with ThreadPoolExecutor(max_workers=max_workers) as executor:
-        future_to_platform = {}
-        for platform_id, scenario_steps in platform_sequences.items():
-            future = executor.submit(
-                _run_platform_sequence,
-                platform_id,
-                scenario_steps,
-                env,
-                scoring_platform_id,
-                scoring_config,
-                scoring_prompt_template,
-                ground_truth_by_sku,
-                results,
-                filtered_rows,
-                report_path,
-                report_lock,
-            )
-            future_to_platform[future] = platform_id
-        for future in as_completed(future_to_platform):
-            platform_id = future_to_platform[future]
-            try:
-                future.result()
-            except Exception as exc:
-                _log(
-                    "Unexpected error while running platform "
-                    f"platform_id={platform_id}: "
-                    f"{type(exc).__name__}: {exc}"
+    rate_limited_platforms = set(platform_sequences)
+    if scoring_platform_id:
+        rate_limited_platforms.add(scoring_platform_id)
+    _configure_rate_limiters(env, rate_limited_platforms)
+    _configure_scoring_cache(env)
+    try:
+        platform_configs = {
+            platform_id: load_platform_config(platform_id, env)
+            for platform_id in platform_sequences
+        }
+        platform_limits = {
+            platform_id: _resolve_platform_concurrency(platform_id, env)
+            for platform_id in platform_sequences
+        }
+        # By default one worker per stream that can run at once, so every
+        # platform can reach its cap; RUNNER_WORKERS bounds the total.
+        worker_count = _read_env_int(
+            env,
+            "RUNNER_WORKERS",
+            sum(
+                min(platform_limits[platform_id], len(scenario_steps))
+                for platform_id, scenario_steps in platform_sequences.items()
+            ),
+        )
+        scoring_workers = _resolve_scoring_concurrency(env)
+        # Leaving the scoring executor's block waits for any scoring still queued
+        # after the scenario streams finish, before the result writer stops.
+        with _result_writer(results, filtered_rows, report_path) as result_queue:
+            with ThreadPoolExecutor(max_workers=scoring_workers) as scoring_executor:
+                scoring_batcher = _ScoringBatcher(
+                    functools.partial(
+                        scoring_executor.submit,
+                        _score_and_record,
+                        scoring_platform_id=scoring_platform_id,
+                        scoring_config=scoring_config,
+                        scoring_prompt_template=scoring_prompt_template,
+                        ground_truth_by_sku=ground_truth_by_sku,
+                        result_queue=result_queue,
+                    ),
+                    _read_env_int(env, "SCORING_BATCH_SIZE", DEFAULT_SCORING_BATCH_SIZE),
+                    _read_env_int(
+                        env, "SCORING_BATCH_WAIT_MS", DEFAULT_SCORING_BATCH_WAIT_MS
+                    )
+                    / 1000.0,
+                )
+                run_stream = functools.partial(
+                    _run_scenario,
+                    platform_configs=platform_configs,
+                    scoring_platform_id=scoring_platform_id,
+                    result_queue=result_queue,
+                    scoring_batcher=scoring_batcher,
+                    scorable_step_types=_resolve_scorable_step_types(env),
+                    min_scorable_chars=_read_env_int(
+                        env, "SCORING_MIN_RESPONSE_CHARS", DEFAULT_MIN_SCORABLE_CHARS
+                    ),
+                    completed=completed,
                 )
+                _run_scenario_streams(
+                    platform_sequences, platform_limits, max(1, worker_count), run_stream
+                )
+                scoring_batcher.flush()
+    finally:
+        # Release pooled sockets and the scoring cache even when the run fails.
+        close_connections()
+        _close_scoring_cache()
+    # Progress writes skip compression; the final report is deflated once.
+    write_report(results, filtered_rows, report_path=report_path)
     _log(f"Wrote report for {len(results)} steps")
     return results
 
@@ -234,7 +753,7 @@ def _execute_step(platform_id, prompt, config):
     # Route step execution to the correct platform client.
     if not config:
         raise ValueError(f"Missing config for platform_id={platform_id}")
-    platform_id = platform_id.upper()
+    _acquire_rate_limit(platform_id, prompt)
     if platform_id == "GEMINI":
         return execute_gemini_prompt(prompt, config)
     response = execute_prompt(platform_id, prompt, config)
@@ -242,8 +761,9 @@ def _execute_step(platform_id, prompt, config):
     return response, text_response
 
 
-def _execute_step_with_retries(platform_id, prompt, config, scenario_id, step):
-    # Retry model calls a limited number of times before surfacing the error.
+def _execute_step_with_retries(platform_id, prompt, config, ctx):
+    # Retry transient model call failures a limited number of times before
+    # surfacing the error; ctx identifies the step in log lines.
     last_exc = None
     total_attempts = STEP_RETRY_COUNT + 1
     for attempt in range(1, total_attempts + 1):
@@ -251,24 +771,199 @@ def _execute_step_with_retries(platform_id, prompt, config, scenario_id, step):
             return _execute_step(platform_id, prompt, config)
         except Exception as exc:
             last_exc = exc
-            if attempt <= STEP_RETRY_COUNT:
+            if attempt <= STEP_RETRY_COUNT and _is_retryable_error(exc):
                 _log(
                     "Model call failed; retrying "
-                    f"attempt={attempt}/{total_attempts} "
-                    f"scenario_id={scenario_id} platform_id={platform_id} "
-                    f"step_id={step.get('step_id', '')} step_index={step.get('step_index', '')}: "
+                    f"attempt={attempt}/{total_attempts} {ctx}: "
                     f"{type(exc).__name__}: {exc}"
                 )
-                time.sleep(STEP_RETRY_BACKOFF_SECONDS * attempt)
+                time.sleep(_retry_delay(exc, attempt))
                 continue
             break
     raise last_exc
 
 
-def _maybe_throttle(platform_id):
-    # Apply per-platform rate limits.
-    if platform_id.upper() == "CLAUDE":
-        time.sleep(CLAUDE_DELAY_SECONDS)
+def _is_retryable_error(exc):
+    # Connection failures, timeouts, throttling and server errors are retried;
+    # request errors such as 400 or 401 are not.
+    status = getattr(exc, "code", None)
+    if isinstance(status, int) and status >= 400:
+        return status in _RETRYABLE_STATUS_CODES or status >= 500
+    return isinstance(exc, _retryable_error_types())
+
+
+@functools.lru_cache(maxsize=None)
+def _retryable_error_types():
+    # Exception types treated as transient. google-genai raises httpx errors
+    # for connection failures and timeouts; httpx is only importable when
+    # google-genai is installed.
+    try:
+        import httpx
+    except ImportError:
+        return _RETRYABLE_ERRORS
+    return _RETRYABLE_ERRORS + (
+        httpx.TimeoutException,
+        httpx.NetworkError,
+        httpx.RemoteProtocolError,
+    )
+
+
+def _retry_delay(exc, attempt):
+    # Seconds to wait before retry number attempt: the server's Retry-After
+    # (capped) when it sends one, otherwise capped exponential backoff with
+    # full jitter.
+    # urllib's HTTPError carries headers itself; SDK errors (google-genai's
+    # APIError) keep them on the HTTP response they wrap.
+    headers = getattr(exc, "headers", None)
+    if headers is None:
+        headers = getattr(getattr(exc, "response", None), "headers", None)
+    retry_after = _parse_retry_after(headers)
+    if retry_after is not None:
+        return min(retry_after, STEP_RETRY_AFTER_MAX_SECONDS)
+    delay = min(
+        STEP_RETRY_MAX_BACKOFF_SECONDS,
+        STEP_RETRY_BACKOFF_SECONDS * (2 ** (attempt - 1)),
+    )
+    return random.uniform(0, delay)
+
+
+def _parse_retry_after(headers):
+    # Read a Retry-After header given as seconds or as an HTTP date.
+    value = headers.get("Retry-After") if headers is not None else None
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    parsed = email.utils.parsedate_tz(value)
+    if parsed is None:
+        return None
+    return max(0.0, email.utils.mktime_tz(parsed) - time.time())
+
+
+def _resolve_platform_concurrency(platform_id, env):
+    # Read {PLATFORM}_CONCURRENCY from env, falling back to the default.
+    return _read_env_int(
+        env, f"{platform_id}_CONCURRENCY", DEFAULT_PLATFORM_CONCURRENCY
+    )
+
+
+def _resolve_scoring_concurrency(env):
+    # Read SCORING_CONCURRENCY from env, falling back to the default.
+    return _read_env_int(env, "SCORING_CONCURRENCY", DEFAULT_SCORING_CONCURRENCY)
+
+
+def _resolve_scorable_step_types(env):
+    # Read SCORING_STEP_TYPES (comma-separated); None scores every step type.
+    value = (env.get("SCORING_STEP_TYPES") or "").strip()
+    if not value:
+        return None
+    return frozenset(part.strip() for part in value.split(",") if part.strip())
+
+
+def _is_scorable(step, model_response, scorable_step_types, min_scorable_chars):
+    # Whether a step's response is worth a scoring call; blank responses and
+    # provider error payloads never are.
+    text = model_response.strip()
+    if not text or len(text) < min_scorable_chars:
+        return False
+    if _ERROR_PAYLOAD_RE.match(text):
+        return False
+    if scorable_step_types is None:
+        return True
+    return step.get("step_type", "") in scorable_step_types
+
+
+def _read_env_int(env, key, default):
+    # Parse a positive int env value; missing or invalid values use default.
+    value = (env.get(key) or "").strip()
+    try:
+        return max(1, int(value))
+    except ValueError:
+        return default
+
+
+def _read_env_float(env, key, default):
+    # Parse a non-negative float env value; missing or invalid values use default.
+    value = (env.get(key) or "").strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        return default
+
+
+_RATE_LIMITERS = {}
+
+
+def _configure_rate_limiters(env, platform_ids):
+    # Build one limiter per platform from {PLATFORM}_RPM, {PLATFORM}_TPM and
+    # {PLATFORM}_MIN_INTERVAL. The default interval only goes with the
+    # default RPM; setting either value replaces both defaults' pacing.
+    _RATE_LIMITERS.clear()
+    for platform_id in platform_ids:
+        max_rpm = _read_env_int(
+            env, f"{platform_id}_RPM", DEFAULT_PLATFORM_RPM.get(platform_id)
+        )
+        max_tpm = _read_env_int(env, f"{platform_id}_TPM", None)
+        pacing_set = any(
+            (env.get(f"{platform_id}_{suffix}") or "").strip()
+            for suffix in ("RPM", "MIN_INTERVAL")
+        )
+        min_interval = _read_env_float(
+            env,
+            f"{platform_id}_MIN_INTERVAL",
+            0.0 if pacing_set else DEFAULT_PLATFORM_MIN_INTERVAL.get(platform_id, 0.0),
+        )
+        if max_rpm or max_tpm or min_interval:
+            _RATE_LIMITERS[platform_id] = RateLimiter(
+                max_rpm=max_rpm, max_tpm=max_tpm, min_interval=min_interval
+            )
+
+
+def _acquire_rate_limit(platform_id, prompt):
+    # Wait for the platform's rate limit, estimating ~4 characters per token.
+    limiter = _RATE_LIMITERS.get(platform_id)
+    if limiter:
+        limiter.acquire(estimated_tokens=len(prompt) // 4)
+
+
+_SCORING_CACHE = None
+
+
+def _configure_scoring_cache(env):
+    # Open the scoring cache at SCORING_CACHE_PATH; caching is off when unset.
+    global _SCORING_CACHE
+    path = (env.get("SCORING_CACHE_PATH") or "").strip()
+    _SCORING_CACHE = ScoringCache(path) if path else None
+
+
+def _close_scoring_cache():
+    global _SCORING_CACHE
+    if _SCORING_CACHE is not None:
+        _SCORING_CACHE.close()
+        _SCORING_CACHE = None
+
+
+def _scoring_cache_key(scoring_platform_id, scoring_config, scoring_prompt):
+    # Key on everything that determines the reply: platform, model and the
+    # fully rendered prompt (template, step, response and ground truth).
+    if _SCORING_CACHE is None:
+        return None
+    return ScoringCache.make_key(
+        scoring_platform_id, scoring_config.get("model", ""), scoring_prompt
+    )
+
+
+def _scoring_cache_get(cache_key):
+    if cache_key is None:
+        return None
+    return _SCORING_CACHE.get(cache_key)
+
+
+def _scoring_cache_put(cache_key, values):
+    if cache_key is not None:
+        _SCORING_CACHE.put(cache_key, values)
 
 
 def _score_step(
@@ -283,9 +978,9 @@ def _score_step(
     if not scoring_platform_id or not scoring_config:
         return {}, ""
     if not scoring_prompt_template:
-        return {field: "" for field in SCORING_FIELDS}, "Scoring prompt missing."
+        return _EMPTY_SCORES.copy(), "Scoring prompt missing."
     if not model_response:
-        return {field: "" for field in SCORING_FIELDS}, ""
+        return _EMPTY_SCORES.copy(), ""
 
     scoring_prompt = _build_scoring_prompt(
         scoring_prompt_template,
@@ -293,14 +988,23 @@ def _score_step(
         model_response,
         ground_truth_by_sku,
     )
+    cache_key = _scoring_cache_key(scoring_platform_id, scoring_config, scoring_prompt)
     try:
-        scoring_raw = execute_prompt(scoring_platform_id, scoring_prompt, scoring_config)
+        cached = _scoring_cache_get(cache_key)
+        if cached is not None:
+            return cached, ""
+        _acquire_rate_limit(scoring_platform_id, scoring_prompt)
+        scoring_raw = execute_prompt(
+            scoring_platform_id,
+            scoring_prompt,
+            scoring_config,
+            cacheable_prefix=_scoring_template_sections(scoring_prompt_template)[0],
+        )
         scoring_text = _extract_text_response(scoring_platform_id, scoring_raw)
         scores = _parse_scoring_response(scoring_text)
-        normalized = {
-            field: _normalize_scoring_value(scores.get(field, ""))
-            for field in SCORING_FIELDS
-        }
+        normalized = _normalize_scores(scores)
+        if scores:
+            _scoring_cache_put(cache_key, normalized)
         return normalized, ""
     except Exception as exc:
         _log(
@@ -310,7 +1014,7 @@ def _score_step(
             f"{type(exc).__name__}: {exc}"
         )
         error = f"Scoring error: {type(exc).__name__}: {exc}"
-        return {field: "" for field in SCORING_FIELDS}, error
+        return _EMPTY_SCORES.copy(), error
 
 
 def _join_comment(comment, extra):
@@ -330,63 +1034,204 @@ def _build_scoring_prompt(
 ):
     # Fill the scoring prompt template with the current step + ground truth.
     sku_id = step.get("sku_id", "")
-    ground_truth = ground_truth_by_sku.get(sku_id, "")
-    return scoring_prompt_template.format(
-        step_type=step.get("step_type", ""),
-        user_prompt=step.get("user_prompt", ""),
-        model_response=model_response,
-        ground_truth=ground_truth,
-    )
+    values = {
+        "step_type": step.get("step_type", ""),
+        "user_prompt": step.get("user_prompt", ""),
+        "model_response": model_response,
+        "ground_truth": ground_truth_by_sku.get(sku_id, ""),
+    }
+    segments = _split_scoring_template(scoring_prompt_template)
+    if segments is None:
+        return scoring_prompt_template.format(**values)
+    parts = []
+    for literal, field in segments:
+        parts.append(literal)
+        if field is not None:
+            parts.append(str(values[field]))
+    return "".join(parts)
 
 
-def _parse_scoring_response(scoring_text):
-    # Parse JSON response, falling back to extracting the first JSON object.
-    try:
-        return json.loads(scoring_text)
-    except (TypeError, ValueError):
-        pass
+@functools.lru_cache(maxsize=8)
+def _split_scoring_template(scoring_prompt_template):
+    # Split the template into (literal, field) pairs once; joining them is far
+    # cheaper than str.format rescanning the whole template on every step.
+    # Returns None for templates using format features beyond plain fields, so
+    # str.format still handles (and reports errors for) those.
+    segments = []
+    for literal, field, spec, conversion in string.Formatter().parse(
+        scoring_prompt_template
+    ):
+        if field is not None and (
+            field not in _SCORING_TEMPLATE_FIELDS or spec or conversion
+        ):
+            return None
+        segments.append((literal, field))
+    return tuple(segments)
+
+
+def _build_batched_scoring_prompt(
+    scoring_prompt_template,
+    steps,
+    model_responses,
+    ground_truth_by_sku,
+):
+    # Keep the template's instructions once and repeat only its per-step input
+    # section.
+    instructions, step_template = _scoring_template_sections(scoring_prompt_template)
+    parts = [
+        instructions,
+        f"This request contains {len(steps)} steps, numbered from 0. Score each "
+        "step independently and output a JSON array with one object per step, "
+        "in the same order. Each object must contain the fields above plus "
+        '"index" set to the step number.\n',
+    ]
+    for index, (step, model_response) in enumerate(zip(steps, model_responses)):
+        parts.append(f"\nStep {index}:\n")
+        parts.append(
+            _build_scoring_prompt(
+                step_template, step, model_response, ground_truth_by_sku
+            )
+        )
+    return "".join(parts)
 
+
+@functools.lru_cache(maxsize=8)
+def _scoring_template_sections(scoring_prompt_template):
+    # Split the template into its static instructions (rendered, braces
+    # unescaped) and the per-step input section, which starts at the line
+    # holding the first placeholder. Every scoring prompt starts with the
+    # instructions, which makes them a cacheable prefix for the provider.
+    positions = [
+        scoring_prompt_template.find("{" + field + "}")
+        for field in _SCORING_TEMPLATE_FIELDS
+        if "{" + field + "}" in scoring_prompt_template
+    ]
+    cut = scoring_prompt_template.rfind("\n", 0, min(positions, default=0)) + 1
+    instructions = scoring_prompt_template[:cut].replace("{{", "{").replace("}}", "}")
+    return instructions, scoring_prompt_template[cut:]
+
+
+def _parse_scoring_response(scoring_text, expected=dict):
+    # Parse the scoring JSON: an object, or an array (expected=list) for
+    # batched replies. A fenced code block is tried first; otherwise each
+    # candidate opening bracket is decoded in place with raw_decode, which
+    # stops at the end of the value and ignores trailing text. Only values
+    # shaped like scores are accepted, so a nested array or an unrelated
+    # object in the reply is skipped.
     if not scoring_text:
-        return {}
+        return expected()
+    if scoring_text.lstrip()[:1] in _JSON_START_CHARS:
+        try:
+            value = json.loads(scoring_text)
+        except ValueError:
+            value = None
+        if _is_scores_value(value, expected):
+            return value
 
-    start = scoring_text.find("{")
-    end = scoring_text.rfind("}")
-    if start == -1 or end == -1 or end <= start:
-        return {}
-    try:
-        return json.loads(scoring_text[start : end + 1])
-    except (TypeError, ValueError):
-        return {}
+    fence = _JSON_CODE_FENCE_RE.search(scoring_text)
+    if fence:
+        try:
+            value, _ = _JSON_DECODER.raw_decode(fence.group(1))
+        except ValueError:
+            value = None
+        if _is_scores_value(value, expected):
+            return value
+
+    open_char = "[" if expected is list else "{"
+    start = scoring_text.find(open_char)
+    while start != -1:
+        try:
+            value, _ = _JSON_DECODER.raw_decode(scoring_text, start)
+        except ValueError:
+            value = None
+        if _is_scores_value(value, expected):
+            return value
+        start = scoring_text.find(open_char, start + 1)
+    return expected()
+
+
+def _is_scores_value(value, expected):
+    # A scores object carries at least one scoring field; a batched reply is
+    # a non-empty list of such objects.
+    if expected is list:
+        return (
+            isinstance(value, list)
+            and bool(value)
+            and all(_is_scores_value(entry, dict) for entry in value)
+        )
+    return isinstance(value, dict) and not _SCORING_FIELDS_SET.isdisjoint(value)
 
 
 def _log(message):
-    print(message)
+    _LOGGER.info(message)
+
+
+@contextlib.contextmanager
+def _queued_logging():
+    # Route runner logs to stdout through a QueueListener thread, so worker
+    # threads only enqueue records instead of contending for stdout. Left
+    # alone when the caller has configured logging handlers already.
+    if _LOGGER.handlers or logging.getLogger().handlers:
+        yield
+        return
+    log_queue = queue.SimpleQueue()
+    stream_handler = logging.StreamHandler(sys.stdout)
+    stream_handler.setFormatter(logging.Formatter("%(message)s"))
+    listener = logging.handlers.QueueListener(log_queue, stream_handler)
+    queue_handler = logging.handlers.QueueHandler(log_queue)
+    previous_level = _LOGGER.level
+    previous_propagate = _LOGGER.propagate
+    listener.start()
+    try:
+        _LOGGER.addHandler(queue_handler)
+        _LOGGER.setLevel(logging.INFO)
+        _LOGGER.propagate = False
+        yield
+    finally:
+        # Stopping drains the queue, so no record is lost on exit.
+        listener.stop()
+        _LOGGER.removeHandler(queue_handler)
+        _LOGGER.setLevel(previous_level)
+        _LOGGER.propagate = previous_propagate
 
 
 def _group_by_scenario(rows, scenario_start=None, scenario_end=None):
-    # Group rows by scenario/platform and sort each group by step_index.
-    scenarios = {}
-    scenario_ids = sorted({row.get("scenario_id", "") for row in rows})
-    scenario_ids = _filter_scenario_ids(scenario_ids, scenario_start, scenario_end)
-    scenario_id_set = set(scenario_ids)
+    # Group rows by scenario and normalized platform (_platform_id) and sort
+    # each group by step_index (pre-parsed into _step_index_f when rows are
+    # loaded). Scenarios come back in natural id order (Q2 before Q10).
+    grouped = collections.defaultdict(lambda: collections.defaultdict(list))
     for row in rows:
-        scenario_id = row.get("scenario_id", "")
-        if scenario_id not in scenario_id_set:
-            continue
-        platform_id = row.get("platform_id", "")
-        scenarios.setdefault(scenario_id, {})
-        scenarios[scenario_id].setdefault(platform_id, [])
-        scenarios[scenario_id][platform_id].append(row)
+        platform_id = row["_platform_id"]
+        grouped[row.get("scenario_id", "")][platform_id].append(row)
 
-    for platforms in scenarios.values():
-        for platform_id, steps in platforms.items():
-            platforms[platform_id] = sorted(
-                steps, key=lambda r: _to_float(r.get("step_index", "0"))
-            )
+    # Split each id once; the parts serve both the sort and the window filter.
+    id_parts = {scenario_id: _split_scenario_id(scenario_id) for scenario_id in grouped}
+    scenario_ids = sorted(
+        grouped, key=lambda scenario_id: _scenario_sort_key(scenario_id, id_parts)
+    )
+    scenario_ids = _filter_scenario_ids(
+        scenario_ids, scenario_start, scenario_end, id_parts
+    )
+    scenarios = {}
+    for scenario_id in scenario_ids:
+        platforms = dict(grouped[scenario_id])
+        # Only groups that survived filtering are sorted, in place.
+        for steps in platforms.values():
+            steps.sort(key=_STEP_SORT_KEY)
+        scenarios[scenario_id] = platforms
     return scenarios
 
 
-def _filter_scenario_ids(scenario_ids, scenario_start, scenario_end):
+def _scenario_sort_key(scenario_id, id_parts):
+    # Prefix then number for ids with a numeric suffix; other ids sort after,
+    # by text.
+    prefix, number = id_parts[scenario_id]
+    if number is None:
+        return (1, scenario_id, 0)
+    return (0, prefix, number)
+
+
+def _filter_scenario_ids(scenario_ids, scenario_start, scenario_end, id_parts):
     # Filter scenario ids to a start/end window (inclusive) when provided.
     if scenario_start is None and scenario_end is None:
         return scenario_ids
@@ -394,10 +1239,11 @@ def _filter_scenario_ids(scenario_ids, scenario_start, scenario_end):
     end = scenario_end if scenario_end is not None else scenario_ids[-1]
     start_num = _parse_scenario_numeric(start)
     end_num = _parse_scenario_numeric(end)
+    numeric_window = start_num is not None or end_num is not None
     filtered = []
     for scenario_id in scenario_ids:
-        scenario_num = _parse_scenario_numeric(scenario_id)
-        if (start_num is not None or end_num is not None) and scenario_num is not None:
+        scenario_num = id_parts[scenario_id][1]
+        if numeric_window and scenario_num is not None:
             if start_num is not None and scenario_num < start_num:
                 continue
             if end_num is not None and scenario_num > end_num:
@@ -414,20 +1260,24 @@ def _parse_scenario_numeric(value):
     # Extract numeric suffix for IDs like Q001; return int or None.
     if value is None:
         return None
+    return _split_scenario_id(value)[1]
+
+
+def _split_scenario_id(value):
+    # Split IDs like Q001 into ("Q", 1); the number is None without a numeric
+    # suffix.
     text = str(value).strip()
-    if text.isdigit():
-        return int(text)
-    match = re.match(r"^[A-Za-z]+([0-9]+)$", text)
+    match = _SCENARIO_ID_RE.fullmatch(text)
     if not match:
-        return None
-    return int(match.group(1))
+        return text, None
+    return match.group(1), int(match.group(2))
 
 
 def _flatten_scenarios(scenarios):
-    # Flatten grouped scenarios back into a list of rows.
+    # Flatten grouped scenarios back into a list of rows; scenarios are
+    # already in order from _group_by_scenario.
     rows = []
-    for scenario_id in sorted(scenarios.keys()):
-        platforms = scenarios[scenario_id]
+    for platforms in scenarios.values():
         for platform_id in sorted(platforms.keys()):
             rows.extend(platforms[platform_id])
     return rows
@@ -436,8 +1286,7 @@ def _flatten_scenarios(scenarios):
 def _build_platform_sequences(scenarios):
     # Build ordered scenario lists per platform to avoid cross-platform blocking.
     platform_sequences = {}
-    for scenario_id in sorted(scenarios.keys()):
-        platforms = scenarios[scenario_id]
+    for scenario_id, platforms in scenarios.items():
         for platform_id in sorted(platforms.keys()):
             platform_sequences.setdefault(platform_id, [])
             platform_sequences[platform_id].append((scenario_id, platforms[platform_id]))
@@ -453,13 +1302,23 @@ def _to_float(value):
 
 
 def _extract_text_response(platform_id, response_text):
-    # Extract plain text content from a response payload.
-    platform_id = platform_id.upper()
-    # Best-effort parsing of common response shapes.
+    # Extract plain text content from a response payload; platform_id is
+    # already uppercase. Best-effort parsing of common response shapes.
+    if not response_text or response_text.lstrip()[:1] not in _JSON_START_CHARS:
+        return response_text or ""
+    if (
+        platform_id in _MESSAGE_CONTENT_PLATFORMS
+        and len(response_text) >= _FAST_EXTRACT_MIN_CHARS
+    ):
+        text = _match_message_content(response_text)
+        if text:
+            return text
     try:
         data = json.loads(response_text)
-    except (TypeError, ValueError):
-        return response_text or ""
+    except ValueError:
+        return response_text
+    if not isinstance(data, dict):
+        return response_text
 
     if platform_id == "CHATGPT":
         output_text = data.get("output_text")
@@ -493,35 +1352,65 @@ def _extract_text_response(platform_id, response_text):
     return response_text or ""
 
 
+def _match_message_content(response_text):
+    # Pull the first choice's message content out of the raw body, or ""
+    # when the shape is unexpected (including null content) so the caller
+    # falls back to a full parse.
+    choices = _CHOICES_KEY_RE.search(response_text)
+    if not choices:
+        return ""
+    message = _MESSAGE_KEY_RE.search(response_text, choices.end())
+    if not message:
+        return ""
+    match = _MESSAGE_CONTENT_RE.match(response_text, message.end())
+    if not match:
+        return ""
+    try:
+        return json.loads('"' + match.group(1) + '"')
+    except ValueError:
+        return ""
+
+
 def _build_conversation_prompt(history, user_prompt):
-    # Build a plain-text conversation transcript for stateless APIs.
-    parts = []
-    for turn in history:
-        role = turn.get("role")
-        content = turn.get("content", "")
-        if not content:
-            continue
-        label = "User" if role == "user" else "Assistant"
-        parts.append(f"{label}: {content}")
-    parts.append(f"User: {user_prompt}")
-    return "\n".join(parts)
+    # Build a plain-text conversation transcript for stateless APIs; history
+    # holds already formatted lines, so each step only formats its own prompt.
+    if not history:
+        return f"User: {user_prompt}"
+    return "\n".join(history) + f"\nUser: {user_prompt}"
 
 
 def _append_conversation_turn(history, user_prompt, assistant_response):
-    # Append a user/assistant turn pair to conversation history.
-    history.append({"role": "user", "content": user_prompt})
-    history.append({"role": "assistant", "content": assistant_response})
+    # Append a user/assistant turn pair to conversation history as transcript
+    # lines, skipping empty turns.
+    if user_prompt:
+        history.append(f"User: {user_prompt}")
+    if assistant_response:
+        history.append(f"Assistant: {assistant_response}")
 
 
-def _normalize_scoring_value(value):
-    # Normalize nulls to empty values for clean XLSX cells.
-    if value is None:
-        return ""
-    return value
+def _normalize_scores(scores):
+    # Start every scoring field blank and fill in what the reply provided in
+    # one pass over it; nulls stay blank for clean XLSX cells.
+    normalized = _EMPTY_SCORES.copy()
+    for field, value in scores.items():
+        if field in _SCORING_FIELDS_SET and value is not None:
+            normalized[field] = value
+    return normalized
 
 
 def _load_scoring_prompt_template(path):
-    # Load the scoring prompt template from disk.
+    # Load the scoring prompt template from disk. Cached per (path, mtime), so
+    # repeated runs in one process skip the read until the file changes; the
+    # split into static and per-step segments is cached on the text itself.
+    try:
+        mtime = os.path.getmtime(path)
+    except OSError:
+        return ""
+    return _load_scoring_prompt_template_cached(path, mtime)
+
+
+@functools.lru_cache(maxsize=4)
+def _load_scoring_prompt_template_cached(path, mtime):
     try:
         with open(path, "r", encoding="utf-8") as handle:
             return handle.read()
@@ -531,6 +1420,7 @@ def _load_scoring_prompt_template(path):
 
 def _resolve_step_identity(scenario_id, platform_id, step):
     # Prefer explicit step identifiers; warn if they disagree with grouping.
+    # platform_id is the normalized group id; the step keeps its input value.
     step_scenario_id = step.get("scenario_id") or scenario_id
     step_platform_id = step.get("platform_id") or platform_id
     if step.get("scenario_id") and step.get("scenario_id") != scenario_id:
@@ -538,7 +1428,7 @@ def _resolve_step_identity(scenario_id, platform_id, step):
             "Step scenario_id mismatch; using step value "
             f"step_scenario_id={step_scenario_id} grouped_scenario_id={scenario_id}"
         )
-    if step.get("platform_id") and step.get("platform_id") != platform_id:
+    if step.get("platform_id") and step.get("_platform_id") != platform_id:
         _log(
             "Step platform_id mismatch; using step value "
             f"step_platform_id={step_platform_id} grouped_platform_id={platform_id}"
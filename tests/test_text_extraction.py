@@ -0,0 +1,28 @@
+import json
+import time
+import unittest
+
+from test_runner import _extract_text_response, _match_message_content
+
+
+class MessageContentFastPathTest(unittest.TestCase):
+    def test_unterminated_content_is_rejected_quickly(self):
+        # A truncated body must not make the content regex backtrack
+        # exponentially; it falls back to the full parse instead.
+        body = '{"choices":[{"message":{"role":"assistant","content":"' + 'ab\\"c ' * 8000
+        started = time.monotonic()
+        self.assertEqual(_match_message_content(body), "")
+        self.assertEqual(_extract_text_response("PERPLEX", body), body)
+        self.assertLess(time.monotonic() - started, 1.0)
+
+    def test_large_well_formed_content_is_extracted(self):
+        content = 'line "quoted" \\ end\n' * 5000
+        body = json.dumps(
+            {"choices": [{"message": {"role": "assistant", "content": content}}]}
+        )
+        self.assertEqual(_match_message_content(body), content)
+        self.assertEqual(_extract_text_response("COPILOT", body), content)
+
+
+if __name__ == "__main__":
+    unittest.main()